@@ -1,291 +1,488 @@
-import os
-import aiohttp
-import asyncio
-from dotenv import load_dotenv
-from supabase import create_client
-import uuid
-import datetime
-import time
-from tqdm import tqdm
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Retrieve API keys from environment variables
-FLICKR_API_KEY = os.getenv("FLICKR_API_KEY")
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-# Connect to Supabase
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-
-# List of art-related prompts
-SEARCH_QUERIES = [
-]
-
-# COMPLETED_QUERIES = [
-#     "photography",
-#     "digital art",
-#     "abstract art",
-#     "contemporary art",
-#     "painting",
-  # "street photography",
-  # "landscape photography",
-  # "portrait photography",
-  # "fine art photography",
-  # "modern art",
-  # "minimalist art",
-  # "conceptual art",
-  # "collage art",
-  # "surrealism",
-  # "pop art",
-  # "impressionism",
-  # "expressionism",
-  # "installation art",
-  # "mixed media art",
-  # "black and white photography",
-  # "macro photography",
-  # "nature photography",
-  # "urban photography",
-  # "experimental photography",
-  # "still life photography",
-  # "documentary photography",
-  # "visual art",
-  # "photojournalism",
-  # "cinematic photography",
-  # "colorful art",
-    #   "art brut",
-    # "futurism in art",
-    # "art deco posters",
-    # "Japanese woodblock prints",
-    # "digital collage techniques",
-    # "aerial photography art",
-    # "neon art installations",
-    # "textile art contemporary",
-    # "kinetic sculpture",
-    # "automata art",
-    # "AI-generated art ethics",
-    # "interactive digital installations",
-    # "zine art culture",
-    # "graffiti typography",
-    # "glitch art aesthetics",
-    # "data-driven art projects",
-    # "bio art examples",
-    # "eco art movements",
-    # "video art installations",
-    # "generative art algorithms",
-    # "performance art documentation",
-    # "lowbrow art movement",
-    # "art and machine learning",
-    # "political satire in visual art",
-    # "immersive art experiences",
-    #   "fabrics",
-    # "textiles",
-    # "pottery",
-    # "ceramics",
-    # "glass",
-    # "metalwork",
-    # "woodworking",
-    # "sculpture",
-    # "installation",
-    # "performance",
-    # "3d printing",
-    # "3d modeling",
-    # # Traditional & Fine Arts
-    # "printmaking",
-    # "calligraphy",
-    # "hand lettering",
-    # "bookbinding",
-    # "book arts",
-    # "paper crafts",
-    # "origami",
-    # "quilling",
-    # "paper cutting",
-    # "mosaic art",
-    # "tile work",
-    # "stained glass",
-    # "glass blowing",
-    # "jewelry making",
-    # "metal smithing",
-    # "leather working",
-    # "tooling",
-    # # Contemporary & Digital Arts
-    # "NFT art",
-    # "blockchain art",
-    # "generative art",
-    # "algorithmic design",
-    # "motion graphics",
-    # "animation",
-    # "web art",
-    # "net art",
-    # "virtual reality art",
-    # "augmented reality art",
-    # "sound art",
-    # "audio installations",
-    # "light art",
-    # "projection mapping",
-    # # Mixed Media & Experimental
-    # "assemblage art",
-    # "found object art",
-    # "collage techniques",
-    # "mixed media",
-    # "fiber arts",
-    # "environmental art",
-    # "land art",
-    # "performance documentation",
-    # "participatory installations",
-    # "bio art",
-    # "living sculptures",
-    # # Cultural & Regional Arts
-    # "indigenous art",
-    # "tribal crafts",
-    # "folk art",
-    # "naive art",
-    # "outsider art",
-    # "street art",
-    # "urban murals",
-    # "graffiti art",
-    # "street culture",
-    # "Asian art forms",
-    # "sumi-e",
-    # "ukiyo-e",
-    # "African art",
-    # "tribal masks",
-    # # Niche & Specialized
-    # "miniature art",
-    # "dollhouse art",
-    # "model making",
-    # "dioramas",
-    # "cosplay art",
-    # "costume design",
-    # "tattoo art",
-    # "body art",
-    # "culinary art",
-    # "food sculpture",
-    # "fashion art",
-    # "wearable art",
-    # "architectural art",
-    # "building design",
-# ]
-
-async def search_flickr_images(session, query, min_upload_date, max_upload_date, per_page=500):
-    """Search Flickr for photos matching the query and date range."""
-    url = "https://api.flickr.com/services/rest/"
-    params = {
-        "method": "flickr.photos.search",
-        "api_key": FLICKR_API_KEY,
-        "text": query,
-        "media": "photos",
-        "per_page": per_page,
-        "format": "json",
-        "nojsoncallback": 1,
-        "extras": "views,description,owner_name,date_taken",
-        "min_upload_date": min_upload_date,
-        "max_upload_date": max_upload_date,
-        "safe_search": 1,
-        "license": "1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16" # Exclude All Rights Reserved
-    }
-
-    async with session.get(url, params=params) as response:
-        response_data = await response.json()
-        images = response_data.get("photos", {}).get("photo", [])
-        zero_view_images = [img for img in images if int(img.get("views", 1)) == 0]
-        return zero_view_images
-
-async def get_flickr_realname(session, user_id):
-    """Fetch the real name of a Flickr user by their NSID."""
-    url = "https://api.flickr.com/services/rest/"
-    params = {
-        "method": "flickr.people.getInfo",
-        "api_key": FLICKR_API_KEY,
-        "user_id": user_id,
-        "format": "json",
-        "nojsoncallback": 1
-    }
-
-    try:
-        async with session.get(url, params=params) as response:
-            response_data = await response.json()
-            person = response_data.get("person", {})
-            realname = person.get("realname", {}).get("_content", None)
-            return realname if realname else None
-    except:
-        return None
-
-async def save_to_supabase(session, image_data, query):
-    """Insert image metadata into Supabase."""
-    if not image_data:
-        return
-
-    # Concurrently fetch realnames
-    user_ids = [img.get("owner", "Unknown") for img in image_data]
-    realname_tasks = [get_flickr_realname(session, uid) for uid in user_ids]
-    realnames = await asyncio.gather(*realname_tasks)
-
-    # Prepare entries
-    entries = []
-    for img, realname in zip(image_data, realnames):
-        flickr_page_url = f"https://www.flickr.com/photos/{img['owner']}/{img['id']}"
-
-        img_entry = {
-            "id": str(uuid.uuid4()),
-            "media_type": "image",
-            "source": "Flickr",
-            "creator_name": realname or img.get("ownername", "Unknown"),
-            "url": f"https://live.staticflickr.com/{img['server']}/{img['id']}_{img['secret']}_b.jpg",
-            "title": img.get("title", "Untitled"),
-            "description": img.get("description", {}).get("_content", "No description"),
-            "query": query,
-            "view_url": flickr_page_url,
-            "created_at": img.get("datetaken", "Unknown"),
-            "entry_created_at": datetime.datetime.now(datetime.timezone.utc).isoformat()
-        }
-        entries.append(img_entry)
-
-    # Insert batch (adjust if Supabase has size limits)
-    try:
-        supabase.table("artworks_cc").insert(entries).execute()
-        tqdm.write(f"Inserted {len(entries)} images for query '{query}'")
-    except Exception as e:
-        tqdm.write(f"Supabase insert failed: {e}")
-
-async def run_scraping():
-    """Run the scraping process with cautious concurrency."""
-    start_date = datetime.datetime(2011, 1, 1)
-    end_date = datetime.datetime.now()
-    delta = datetime.timedelta(weeks=4)
-
-    # Generate date ranges
-    date_ranges = []
-    current_date = start_date
-    while current_date < end_date:
-        next_date = current_date + delta
-        date_ranges.append((current_date.strftime("%Y-%m-%d"), next_date.strftime("%Y-%m-%d")))
-        current_date = next_date
-
-    async with aiohttp.ClientSession() as session:
-        for query in tqdm(SEARCH_QUERIES, desc="Search Queries"):
-            for min_date, max_date in tqdm(date_ranges, desc=f"Date ranges for '{query}'", leave=False):
-                try:
-                    images = await search_flickr_images(session, query, min_date, max_date)
-
-                    if isinstance(images, dict) and "stat" in images and images["stat"] == "fail":
-                        error_code = images.get("code", None)
-                        error_msg = images.get("message", "Unknown error")
-
-                        if error_code == 429:
-                            tqdm.write(f"Rate limit exceeded. Sleeping for 1 hour...")
-                            await asyncio.sleep(3600)
-                            break
-
-                        tqdm.write(f"Flickr API error {error_code}: {error_msg}")
-                        break
-
-                    await save_to_supabase(session, images, query)
-
-                except Exception as e:
-                    tqdm.write(f"Unexpected error: {e}. Skipping range.")
-                    continue
-
-if __name__ == "__main__":
-    asyncio.run(run_scraping())
+import os
+import aiohttp
+import asyncio
+from dotenv import load_dotenv
+from supabase import create_client
+import uuid
+import datetime
+import json
+import time
+from tqdm import tqdm
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Retrieve API keys from environment variables
+FLICKR_API_KEY = os.getenv("FLICKR_API_KEY")
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+# Connect to Supabase
+supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+
+# Search planning: sparse related queries share one tag search (Flickr allows
+# up to 20 tags per call) and window lengths adapt to each group's result density
+MAX_TAGS_PER_SEARCH = 20
+MAX_PAGES_PER_WINDOW = 1  # Raise to page through dense windows at extra quota
+DEFAULT_WINDOW_WEEKS = 4
+MIN_WINDOW_WEEKS = DEFAULT_WINDOW_WEEKS  # Never spend more calls than fixed 4-week windows
+MAX_WINDOW_WEEKS = 52
+TARGET_PAGE_FILL = 0.8
+STATS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "query_stats.json")
+
+# List of art-related prompts
+SEARCH_QUERIES = [
+]
+
+# COMPLETED_QUERIES = [
+#     "photography",
+#     "digital art",
+#     "abstract art",
+#     "contemporary art",
+#     "painting",
+  # "street photography",
+  # "landscape photography",
+  # "portrait photography",
+  # "fine art photography",
+  # "modern art",
+  # "minimalist art",
+  # "conceptual art",
+  # "collage art",
+  # "surrealism",
+  # "pop art",
+  # "impressionism",
+  # "expressionism",
+  # "installation art",
+  # "mixed media art",
+  # "black and white photography",
+  # "macro photography",
+  # "nature photography",
+  # "urban photography",
+  # "experimental photography",
+  # "still life photography",
+  # "documentary photography",
+  # "visual art",
+  # "photojournalism",
+  # "cinematic photography",
+  # "colorful art",
+    #   "art brut",
+    # "futurism in art",
+    # "art deco posters",
+    # "Japanese woodblock prints",
+    # "digital collage techniques",
+    # "aerial photography art",
+    # "neon art installations",
+    # "textile art contemporary",
+    # "kinetic sculpture",
+    # "automata art",
+    # "AI-generated art ethics",
+    # "interactive digital installations",
+    # "zine art culture",
+    # "graffiti typography",
+    # "glitch art aesthetics",
+    # "data-driven art projects",
+    # "bio art examples",
+    # "eco art movements",
+    # "video art installations",
+    # "generative art algorithms",
+    # "performance art documentation",
+    # "lowbrow art movement",
+    # "art and machine learning",
+    # "political satire in visual art",
+    # "immersive art experiences",
+    #   "fabrics",
+    # "textiles",
+    # "pottery",
+    # "ceramics",
+    # "glass",
+    # "metalwork",
+    # "woodworking",
+    # "sculpture",
+    # "installation",
+    # "performance",
+    # "3d printing",
+    # "3d modeling",
+    # # Traditional & Fine Arts
+    # "printmaking",
+    # "calligraphy",
+    # "hand lettering",
+    # "bookbinding",
+    # "book arts",
+    # "paper crafts",
+    # "origami",
+    # "quilling",
+    # "paper cutting",
+    # "mosaic art",
+    # "tile work",
+    # "stained glass",
+    # "glass blowing",
+    # "jewelry making",
+    # "metal smithing",
+    # "leather working",
+    # "tooling",
+    # # Contemporary & Digital Arts
+    # "NFT art",
+    # "blockchain art",
+    # "generative art",
+    # "algorithmic design",
+    # "motion graphics",
+    # "animation",
+    # "web art",
+    # "net art",
+    # "virtual reality art",
+    # "augmented reality art",
+    # "sound art",
+    # "audio installations",
+    # "light art",
+    # "projection mapping",
+    # # Mixed Media & Experimental
+    # "assemblage art",
+    # "found object art",
+    # "collage techniques",
+    # "mixed media",
+    # "fiber arts",
+    # "environmental art",
+    # "land art",
+    # "performance documentation",
+    # "participatory installations",
+    # "bio art",
+    # "living sculptures",
+    # # Cultural & Regional Arts
+    # "indigenous art",
+    # "tribal crafts",
+    # "folk art",
+    # "naive art",
+    # "outsider art",
+    # "street art",
+    # "urban murals",
+    # "graffiti art",
+    # "street culture",
+    # "Asian art forms",
+    # "sumi-e",
+    # "ukiyo-e",
+    # "African art",
+    # "tribal masks",
+    # # Niche & Specialized
+    # "miniature art",
+    # "dollhouse art",
+    # "model making",
+    # "dioramas",
+    # "cosplay art",
+    # "costume design",
+    # "tattoo art",
+    # "body art",
+    # "culinary art",
+    # "food sculpture",
+    # "fashion art",
+    # "wearable art",
+    # "architectural art",
+    # "building design",
+# ]
+
+async def search_flickr_images(session, queries, min_upload_date, max_upload_date, per_page=500, page=1):
+    """Search Flickr for photos matching the queries and date range.
+
+    A single query uses the full text search. Merged queries are searched as
+    tags with tag_mode=any, since text search has no OR operator, so they no
+    longer match on titles or descriptions. Results come back oldest first.
+    Returns the raw response so the caller can read the total result count
+    and detect API failures.
+    """
+    url = "https://api.flickr.com/services/rest/"
+    params = {
+        "method": "flickr.photos.search",
+        "api_key": FLICKR_API_KEY,
+        "media": "photos",
+        "per_page": per_page,
+        "page": page,
+        "format": "json",
+        "nojsoncallback": 1,
+        "extras": "views,description,owner_name,date_taken,date_upload,tags",
+        "min_upload_date": min_upload_date,
+        "max_upload_date": max_upload_date,
+        "sort": "date-posted-asc",
+        "safe_search": 1,
+        "license": "1,2,3,4,5,6,7,8,9,10,11,12,13,14,15,16" # Exclude All Rights Reserved
+    }
+    if search_mode(queries) == "text":
+        params["text"] = queries[0]
+    else:
+        params["tags"] = ",".join(query_to_tag(query) for query in queries)
+        params["tag_mode"] = "any"
+
+    async with session.get(url, params=params) as response:
+        return await response.json()
+
+def query_to_tag(query):
+    """Convert a query to Flickr's normalised tag form ("Pop Art" -> "popart")."""
+    return "".join(ch for ch in query.lower() if ch.isalnum())
+
+def search_mode(queries):
+    """Return "text" for a single-query search and "tags" for a merged one."""
+    return "text" if len(queries) == 1 else "tags"
+
+def query_results_per_week(stats, query, mode):
+    """Return a query's search results per week from previous runs, or None.
+
+    Text and tag searches are tracked separately, since a tag search only
+    finds a subset of what the text search does.
+    """
+    entry = stats.get(query, {}).get(mode)
+    if not entry or entry.get("weeks", 0) <= 0:
+        return None
+    return entry["results"] / entry["weeks"]
+
+def group_queries(queries, stats, per_page=500):
+    """Group sparse related queries into combined tag searches.
+
+    Only queries whose text search history shows they can't fill a page even
+    in the widest window are merged, and only with queries sharing a head word
+    ("... photography", "... art"), while the group's combined density still
+    fits one page at that window. Dense queries and queries without history
+    keep their own text search so their coverage is unchanged.
+    """
+    page_budget = TARGET_PAGE_FILL * per_page / MAX_WINDOW_WEEKS
+
+    groups = []
+    by_head = {}
+    for query in queries:
+        rate = query_results_per_week(stats, query, "text")
+        if rate is None or rate >= page_budget:
+            groups.append([query])
+            continue
+        words = query.lower().split()
+        head = words[-1] if words else ""
+        by_head.setdefault(head, []).append((query, rate))
+
+    for head in sorted(by_head):
+        group, group_rate = [], 0.0
+        for query, rate in by_head[head]:
+            if group and (group_rate + rate >= page_budget or len(group) >= MAX_TAGS_PER_SEARCH):
+                groups.append(group)
+                group, group_rate = [], 0.0
+            group.append(query)
+            group_rate += rate
+        if group:
+            groups.append(group)
+    return groups
+
+def attribute_images(images, queries):
+    """Split search results back into per-query lists.
+
+    In a merged group a photo is credited to the most specific (longest)
+    query tag it carries, so a photo matching several queries is only stored
+    once. Photos carrying none of the tags are left out.
+    """
+    if len(queries) == 1:
+        return {queries[0]: list(images)}
+
+    query_tags = sorted(((query_to_tag(query), query) for query in queries), key=lambda qt: len(qt[0]), reverse=True)
+    attributed = {query: [] for query in queries}
+    for img in images:
+        photo_tags = set(img.get("tags", "").split())
+        for tag, query in query_tags:
+            if tag in photo_tags:
+                attributed[query].append(img)
+                break
+    return attributed
+
+def load_query_stats():
+    """Load per-query yield statistics from previous runs."""
+    try:
+        with open(STATS_PATH) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_query_stats(stats):
+    """Persist per-query yield statistics for the next run."""
+    with open(STATS_PATH, "w") as f:
+        json.dump(stats, f, indent=2, sort_keys=True)
+
+def initial_results_per_week(stats, queries):
+    """Estimate how many search results per week a group will return.
+
+    Merged groups fall back to text search history, which overestimates a tag
+    search. Returns None if any member has no history, in which case the
+    planner falls back to the default window.
+    """
+    mode = search_mode(queries)
+    rate = 0.0
+    for query in queries:
+        query_rate = query_results_per_week(stats, query, mode)
+        if query_rate is None and mode == "tags":
+            query_rate = query_results_per_week(stats, query, "text")
+        if query_rate is None:
+            return None
+        rate += query_rate
+    return rate
+
+def plan_window_weeks(results_per_week, per_page):
+    """Choose a window length expected to fill, but not overflow, one page."""
+    if results_per_week is None:
+        return DEFAULT_WINDOW_WEEKS
+    if results_per_week <= 0:
+        return MAX_WINDOW_WEEKS
+    weeks = TARGET_PAGE_FILL * per_page / results_per_week
+    return max(MIN_WINDOW_WEEKS, min(MAX_WINDOW_WEEKS, weeks))
+
+def record_window(stats, mode, attributed, scale, weeks):
+    """Update per-query result density from one accepted search window."""
+    for query, query_images in attributed.items():
+        entry = stats.setdefault(query, {}).setdefault(mode, {"weeks": 0.0, "results": 0.0})
+        entry["weeks"] += weeks
+        entry["results"] += len(query_images) * scale
+
+async def get_flickr_realname(session, user_id):
+    """Fetch the real name of a Flickr user by their NSID."""
+    url = "https://api.flickr.com/services/rest/"
+    params = {
+        "method": "flickr.people.getInfo",
+        "api_key": FLICKR_API_KEY,
+        "user_id": user_id,
+        "format": "json",
+        "nojsoncallback": 1
+    }
+
+    try:
+        async with session.get(url, params=params) as response:
+            response_data = await response.json()
+            person = response_data.get("person", {})
+            realname = person.get("realname", {}).get("_content", None)
+            return realname if realname else None
+    except:
+        return None
+
+async def save_to_supabase(session, image_data, query):
+    """Insert image metadata into Supabase."""
+    if not image_data:
+        return
+
+    # Concurrently fetch realnames
+    user_ids = [img.get("owner", "Unknown") for img in image_data]
+    realname_tasks = [get_flickr_realname(session, uid) for uid in user_ids]
+    realnames = await asyncio.gather(*realname_tasks)
+
+    # Prepare entries
+    entries = []
+    for img, realname in zip(image_data, realnames):
+        flickr_page_url = f"https://www.flickr.com/photos/{img['owner']}/{img['id']}"
+
+        img_entry = {
+            "id": str(uuid.uuid4()),
+            "media_type": "image",
+            "source": "Flickr",
+            "creator_name": realname or img.get("ownername", "Unknown"),
+            "url": f"https://live.staticflickr.com/{img['server']}/{img['id']}_{img['secret']}_b.jpg",
+            "title": img.get("title", "Untitled"),
+            "description": img.get("description", {}).get("_content", "No description"),
+            "query": query,
+            "view_url": flickr_page_url,
+            "created_at": img.get("datetaken", "Unknown"),
+            "entry_created_at": datetime.datetime.now(datetime.timezone.utc).isoformat()
+        }
+        entries.append(img_entry)
+
+    # Insert batch (adjust if Supabase has size limits)
+    try:
+        supabase.table("artworks_cc").insert(entries).execute()
+        tqdm.write(f"Inserted {len(entries)} images for query '{query}'")
+    except Exception as e:
+        tqdm.write(f"Supabase insert failed: {e}")
+
+async def run_scraping():
+    """Run the scraping process with cautious concurrency."""
+    start_date = datetime.datetime(2011, 1, 1)
+    end_date = datetime.datetime.now()
+    per_page = 500
+
+    stats = load_query_stats()
+    groups = group_queries(SEARCH_QUERIES, stats, per_page)
+
+    async with aiohttp.ClientSession() as session:
+        for queries in tqdm(groups, desc="Query groups"):
+            results_per_week = initial_results_per_week(stats, queries)
+            label = ", ".join(queries)
+
+            calls = 0
+            seen_ids = set()
+            current_date = start_date
+            with tqdm(total=(end_date - start_date).days, desc=f"Days for '{label}'", unit="day", leave=False) as pbar:
+                while current_date < end_date:
+                    weeks = plan_window_weeks(results_per_week, per_page)
+                    planned_end = min(current_date + datetime.timedelta(weeks=weeks), end_date)
+                    next_date = planned_end
+                    min_date, max_date = int(current_date.timestamp()), int(planned_end.timestamp())
+                    try:
+                        calls += 1
+                        response_data = await search_flickr_images(session, queries, min_date, max_date, per_page)
+
+                        if response_data.get("stat") == "fail":
+                            error_code = response_data.get("code", None)
+                            error_msg = response_data.get("message", "Unknown error")
+
+                            if error_code == 429:
+                                tqdm.write(f"Rate limit exceeded. Sleeping for 1 hour...")
+                                await asyncio.sleep(3600)
+                                break
+
+                            tqdm.write(f"Flickr API error {error_code}: {error_msg}")
+                            break
+
+                        photos = response_data.get("photos", {})
+                        total = int(photos.get("total", 0) or 0)
+                        images = list(photos.get("photo", []))
+                        pages = min(int(photos.get("pages", 1) or 1), MAX_PAGES_PER_WINDOW)
+                        for page in range(2, pages + 1):
+                            calls += 1
+                            page_data = await search_flickr_images(session, queries, min_date, max_date, per_page, page)
+                            if page_data.get("stat") == "fail":
+                                tqdm.write(f"Flickr API error {page_data.get('code')} on page {page}: {page_data.get('message', 'Unknown error')}")
+                                break
+                            images.extend(page_data.get("photos", {}).get("photo", []))
+
+                        # Blend the observed density into the running estimate
+                        observed = total / ((planned_end - current_date) / datetime.timedelta(weeks=1))
+                        results_per_week = observed if results_per_week is None else (results_per_week + observed) / 2
+
+                        scale = 1
+                        if len(images) < total:
+                            # Results are oldest first, so the fetched pages cover the window up to
+                            # the last photo. Resume from there, but always advance at least
+                            # MIN_WINDOW_WEEKS so a dense query costs no more than one call per window.
+                            last_upload = datetime.datetime.fromtimestamp(int(images[-1].get("dateupload", 0))) if images else current_date
+                            min_end = min(current_date + datetime.timedelta(weeks=MIN_WINDOW_WEEKS), end_date)
+                            if last_upload > min_end:
+                                next_date = last_upload
+                            else:
+                                next_date = min_end
+                                scale = total / len(images) if images else 0
+                                tqdm.write(f"Kept {len(images)} of {total} results for '{label}' from {current_date:%Y-%m-%d} to {next_date:%Y-%m-%d}")
+
+                        # The resumed window starts at the last upload time, which repeats its photos
+                        images = [img for img in images if img.get("id") not in seen_ids]
+                        seen_ids = {img.get("id") for img in images}
+
+                        attributed = attribute_images(images, queries)
+                        unmatched = len(images) - sum(len(query_images) for query_images in attributed.values())
+                        if unmatched:
+                            tqdm.write(f"Dropped {unmatched} results for '{label}' matching none of the query tags")
+
+                        record_window(stats, search_mode(queries), attributed, scale, (next_date - current_date) / datetime.timedelta(weeks=1))
+
+                        for query, query_images in attributed.items():
+                            zero_view_images = [img for img in query_images if int(img.get("views", 1)) == 0]
+                            await save_to_supabase(session, zero_view_images, query)
+
+                    except Exception as e:
+                        tqdm.write(f"Unexpected error: {e}. Skipping range.")
+
+                    # Track whole days from the start so fractional windows add up
+                    pbar.update((next_date - start_date).days - pbar.n)
+                    current_date = next_date
+
+            save_query_stats(stats)
+            tqdm.write(f"Searched '{label}' in {calls} calls")
+
+if __name__ == "__main__":
+    asyncio.run(run_scraping())
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Image preprocessing script for ESP32 offline display.
-Downloads images from Supabase, processes them to 30x30 RGB565 format,
+Downloads images from Supabase, renders each one to every entry in
+RENDER_TARGETS (30x30 RGB565 by default) from a single download and decode,
 and distributes them equally across 4 ESP32 devices.
 """
 
@@ -25,9 +26,24 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
 # Configuration
-TARGET_SIZE = 30
 NUM_ESP32_DEVICES = 4
 
+# Pixel formats: C element type, values per pixel and hex digits per value
+PIXEL_FORMATS = {
+    "rgb565": {"ctype": "uint16_t", "values_per_pixel": 1, "hex_digits": 4, "bytes_per_pixel": 2},
+    "rgb888": {"ctype": "uint8_t", "values_per_pixel": 3, "hex_digits": 2, "bytes_per_pixel": 3},
+}
+
+# Every image is downloaded and decoded once, then rendered to each target.
+# "subdir" is relative to DATA_DIR; an empty subdir writes to data/<device>/
+# as expected by src/main.cpp. "layout" is "serpentine" or "linear".
+RENDER_TARGETS = [
+    {"subdir": "", "width": 30, "height": 30, "format": "rgb565", "layout": "serpentine"},
+]
+
+# Flickr size suffixes and their longest side in pixels, smallest first
+FLICKR_SIZES = [("t", 100), ("m", 240), ("n", 320), ("w", 400), ("z", 640), ("c", 800), ("b", 1024)]
+
 # Output directories
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
@@ -85,8 +101,72 @@ def rgb_to_rgb565(r, g, b):
     """Convert RGB888 to RGB565"""
     return ((r & 0xF8) << 8) | ((g & 0xFC) << 3) | (b >> 3)
 
-def process_image_for_led_strip(image_url, target_width=30, target_height=30, max_retries=3, pbar=None):
-    """Process image using the same logic as the frontend imageProcessing.js"""
+def pack_pixel(r, g, b, pixel_format):
+    """Pack an RGB888 pixel into the values stored for the given format"""
+    if pixel_format == "rgb565":
+        return [rgb_to_rgb565(r, g, b)]
+    if pixel_format == "rgb888":
+        return [r, g, b]
+    raise ValueError(f"Unknown pixel format: {pixel_format}")
+
+def flickr_size_suffix(targets):
+    """Pick the smallest Flickr size whose longest side covers every target"""
+    needed = max(max(target["width"], target["height"]) for target in targets)
+    for suffix, longest_side in FLICKR_SIZES:
+        if longest_side >= needed:
+            return suffix
+    return FLICKR_SIZES[-1][0]
+
+def render_image(img, target):
+    """Render a decoded image for one target using the same logic as the frontend imageProcessing.js"""
+    target_width = target["width"]
+    target_height = target["height"]
+
+    # Calculate crop dimensions (same logic as frontend)
+    img_aspect = img.width / img.height
+    target_aspect = target_width / target_height
+    
+    if img_aspect > target_aspect:
+        source_height = img.height
+        source_width = int(img.height * target_aspect)
+        source_x = (img.width - source_width) // 2
+        source_y = 0
+    else:
+        source_width = img.width
+        source_height = int(img.width / target_aspect)
+        source_x = 0
+        source_y = (img.height - source_height) // 2
+    
+    # Crop and resize
+    img_cropped = img.crop((source_x, source_y, source_x + source_width, source_y + source_height))
+    img_resized = img_cropped.resize((target_width, target_height), Image.Resampling.LANCZOS)
+    
+    # Convert to numpy array for processing
+    pixels = np.array(img_resized)
+    
+    # Apply saturation boost and LED mapping
+    SATURATION_BOOST = 1.5
+    serpentine = target["layout"] == "serpentine"
+    led_data = []
+    
+    for y in range(target_height):
+        for x in range(target_width):
+            # Serpentine mapping: even rows left-to-right, odd rows right-to-left
+            actual_x = target_width - 1 - x if serpentine and y % 2 == 1 else x
+            
+            r, g, b = pixels[y, actual_x]
+            
+            # Convert to HSL, apply saturation boost, convert back to RGB
+            h, s, l = rgb_to_hsl(r, g, b)
+            s = min(s * SATURATION_BOOST, 1.0)
+            r, g, b = hsl_to_rgb(h, s, l)
+            
+            led_data.extend(pack_pixel(r, g, b, target["format"]))
+    
+    return led_data
+
+def download_image(image_url, max_retries=3, pbar=None):
+    """Download and decode an image, retrying on network errors and rate limits"""
     for attempt in range(max_retries):
         try:
             # Download image
@@ -108,53 +188,7 @@ def process_image_for_led_strip(image_url, target_width=30, target_height=30, ma
             response.raise_for_status()
             
             # Open with PIL
-            img = Image.open(BytesIO(response.content)).convert('RGB')
-            
-            # Calculate crop dimensions (same logic as frontend)
-            img_aspect = img.width / img.height
-            target_aspect = target_width / target_height
-            
-            if img_aspect > target_aspect:
-                source_height = img.height
-                source_width = int(img.height * target_aspect)
-                source_x = (img.width - source_width) // 2
-                source_y = 0
-            else:
-                source_width = img.width
-                source_height = int(img.width / target_aspect)
-                source_x = 0
-                source_y = (img.height - source_height) // 2
-            
-            # Crop and resize
-            img_cropped = img.crop((source_x, source_y, source_x + source_width, source_y + source_height))
-            img_resized = img_cropped.resize((target_width, target_height), Image.Resampling.LANCZOS)
-            
-            # Convert to numpy array for processing
-            pixels = np.array(img_resized)
-            
-            # Apply saturation boost and serpentine mapping
-            SATURATION_BOOST = 1.5
-            led_data = []
-            
-            for y in range(target_height):
-                for x in range(target_width):
-                    # Serpentine mapping: even rows left-to-right, odd rows right-to-left
-                    actual_x = target_width - 1 - x if y % 2 == 1 else x
-                    
-                    r, g, b = pixels[y, actual_x]
-                    
-                    # Convert to HSL, apply saturation boost, convert back to RGB
-                    h, s, l = rgb_to_hsl(r, g, b)
-                    s = min(s * SATURATION_BOOST, 1.0)
-                    r, g, b = hsl_to_rgb(h, s, l)
-                    
-                    # Convert to RGB565
-                    rgb565 = rgb_to_rgb565(r, g, b)
-                    led_data.append(rgb565)
-            
-            if pbar:
-                pbar.set_postfix_str("✓ Success")
-            return led_data
+            return Image.open(BytesIO(response.content)).convert('RGB')
             
         except Exception as e:
             if attempt < max_retries - 1:
@@ -170,8 +204,25 @@ def process_image_for_led_strip(image_url, target_width=30, target_height=30, ma
     
     return None
 
-def create_c_header(device_name, images_data):
+def process_image_for_led_strip(image_url, targets=RENDER_TARGETS, max_retries=3, pbar=None):
+    """Download and decode an image once, returning its rendering for each target"""
+    img = download_image(image_url, max_retries=max_retries, pbar=pbar)
+    if img is None:
+        return None
+    
+    # Render errors propagate rather than returning None, so they are never
+    # retried as failed downloads; main() validates targets up front
+    led_data = [render_image(img, target) for target in targets]
+    
+    if pbar:
+        pbar.set_postfix_str("✓ Success")
+    return led_data
+
+def create_c_header(device_name, images_data, target):
     """Create C header file with image data in PROGMEM"""
+    pixel_format = PIXEL_FORMATS[target["format"]]
+    values_per_image = target["width"] * target["height"] * pixel_format["values_per_pixel"]
+    hex_digits = pixel_format["hex_digits"]
     header_content = f"""#ifndef {device_name.upper()}_IMAGES_H
 #define {device_name.upper()}_IMAGES_H
 
@@ -181,17 +232,17 @@ def create_c_header(device_name, images_data):
 #define NUM_IMAGES_{device_name.upper()} {len(images_data)}
 
 // Image data stored in PROGMEM
-const uint16_t {device_name}_images[NUM_IMAGES_{device_name.upper()}][{TARGET_SIZE * TARGET_SIZE}] PROGMEM = {{
+const {pixel_format["ctype"]} {device_name}_images[NUM_IMAGES_{device_name.upper()}][{values_per_image}] PROGMEM = {{
 """
     
     for i, image_data in enumerate(images_data):
         header_content += f"  // Image {i}\n"
         header_content += "  {\n"
         
-        # Format as 16-bit hex values, 15 per line for readability
+        # Format as hex values, 15 per line for readability
         for j in range(0, len(image_data), 15):
             line_data = image_data[j:j+15]
-            hex_values = [f"0x{val:04X}" for val in line_data]
+            hex_values = [f"0x{val:0{hex_digits}X}" for val in line_data]
             header_content += f"    {', '.join(hex_values)}"
             if j + 15 < len(image_data):
                 header_content += ","
@@ -209,10 +260,25 @@ const uint16_t {device_name}_images[NUM_IMAGES_{device_name.upper()}][{TARGET_SI
 def main():
     print("Starting image preprocessing for ESP32 offline display...")
     
+    # Validate render targets before downloading anything
+    for target in RENDER_TARGETS:
+        if (target["format"] not in PIXEL_FORMATS or target["layout"] not in ("serpentine", "linear")
+                or target["width"] <= 0 or target["height"] <= 0):
+            print(f"Invalid render target: {target}")
+            return
+    subdirs = [target["subdir"] for target in RENDER_TARGETS]
+    if len(set(subdirs)) != len(subdirs):
+        print(f"Render targets must each have a unique subdir: {subdirs}")
+        return
+    
+    # One download must be large enough for the biggest target
+    size_suffix = flickr_size_suffix(RENDER_TARGETS)
+    
     # Create data directories
     os.makedirs(DATA_DIR, exist_ok=True)
-    for folder in DEVICE_FOLDERS:
-        os.makedirs(os.path.join(DATA_DIR, folder), exist_ok=True)
+    for target in RENDER_TARGETS:
+        for folder in DEVICE_FOLDERS:
+            os.makedirs(os.path.join(DATA_DIR, target["subdir"], folder), exist_ok=True)
     
     # Initialize Supabase client
     try:
@@ -303,7 +369,8 @@ def main():
         
         device_images = images[start_idx:end_idx]
         
-        processed_images = []
+        # One list of rendered images per target, in RENDER_TARGETS order
+        processed_images = [[] for _ in RENDER_TARGETS]
         successful_count = 0
         failed_images = []
         
@@ -317,8 +384,8 @@ def main():
             
             # Get high-res image URL
             image_url = image_info.get('url', '')
-            # request smaller size
-            image_url = image_url.replace("_b.jpg", "_t.jpg")
+            # request the smallest size that covers every target
+            image_url = image_url.replace("_b.jpg", f"_{size_suffix}.jpg")
             if not image_url:
                 failed_images.append(image_info)
                 image_pbar.set_postfix_str("No URL")
@@ -327,7 +394,8 @@ def main():
             # Process the image
             led_data = process_image_for_led_strip(image_url, pbar=image_pbar)
             if led_data is not None:
-                processed_images.append(led_data)
+                for target_images, target_data in zip(processed_images, led_data):
+                    target_images.append(target_data)
                 successful_count += 1
             else:
                 failed_images.append(image_info)
@@ -352,11 +420,11 @@ def main():
                         still_failed.append(image_info)
                         continue
                     
-                    # Use smaller size for retries to reduce load
-                    image_url = image_url.replace("_b.jpg", "_t.jpg")
+                    image_url = image_url.replace("_b.jpg", f"_{size_suffix}.jpg")
                     led_data = process_image_for_led_strip(image_url, max_retries=5, pbar=retry_pbar)
                     if led_data is not None:
-                        processed_images.append(led_data)
+                        for target_images, target_data in zip(processed_images, led_data):
+                            target_images.append(target_data)
                         successful_count += 1
                     else:
                         still_failed.append(image_info)
@@ -376,16 +444,19 @@ def main():
             device_pbar.set_postfix_str("✗ No images processed")
             continue
         
-        # Create C header file
-        header_content = create_c_header(device_name, processed_images)
-        header_path = os.path.join(DATA_DIR, device_name, "images.h")
-        
-        with open(header_path, 'w') as f:
-            f.write(header_content)
-        
-        # Calculate memory usage
-        memory_usage = successful_count * TARGET_SIZE * TARGET_SIZE * 2
-        print(f"Memory usage: {memory_usage/1024/1024:.1f}MB")
+        # Create a C header file per render target
+        memory_usage = 0
+        for target, target_images in zip(RENDER_TARGETS, processed_images):
+            header_content = create_c_header(device_name, target_images, target)
+            header_path = os.path.join(DATA_DIR, target["subdir"], device_name, "images.h")
+            
+            with open(header_path, 'w') as f:
+                f.write(header_content)
+            
+            # Calculate memory usage
+            target_usage = successful_count * target["width"] * target["height"] * PIXEL_FORMATS[target["format"]]["bytes_per_pixel"]
+            print(f"Memory usage ({target['width']}x{target['height']} {target['format']}): {target_usage/1024/1024:.1f}MB")
+            memory_usage += target_usage
         device_pbar.set_postfix_str(f"✓ {successful_count} images ({memory_usage/1024/1024:.1f}MB)")
     
     device_pbar.close()